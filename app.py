@@ -1,12 +1,13 @@
 import os
 from datetime import date
-from typing import List
+from typing import List, Sequence
 
 import streamlit as st
 
 from ecourts_scraper import EcourtsScraper, CourtSelection
 from ecourts_scraper.utils import append_history
 from ecourts_scraper.simple_scraper import SimpleEcourtsScraper
+from ecourts_scraper.court_index import CourtIndex, CourtPath, format_path
 
 
 st.set_page_config(page_title="eCourts Cause List Downloader", page_icon="📄", layout="centered")
@@ -20,6 +21,18 @@ def get_scraper() -> EcourtsScraper:
 def get_simple_scraper() -> SimpleEcourtsScraper:
     return SimpleEcourtsScraper()
 
+@st.cache_resource(show_spinner="Indexing courts...")
+def get_court_index() -> CourtIndex:
+    simple_scraper = get_simple_scraper()
+    return CourtIndex.build(simple_scraper.get_states(), simple_scraper)
+
+
+def _preselect(options: Sequence[str], picked: CourtPath, level: int) -> int:
+    """Selectbox index for the searched path at ``level`` (0 is the blank option)."""
+    if len(picked) > level and picked[level] in options:
+        return options.index(picked[level]) + 1
+    return 0
+
 
 def main() -> None:
     st.title("eCourts Cause List Downloader")
@@ -28,37 +41,55 @@ def main() -> None:
     scraper = get_scraper()
 
     # Use fallback data immediately for faster loading
-    simple_scraper = get_simple_scraper()
-    states = simple_scraper.get_states()
+    court_index = get_court_index()
+    states = court_index.children()
     st.info("Using fallback data for faster loading")
 
-    state = st.selectbox("State", options=[""] + states, index=0)
+    picked: CourtPath = ()
+    query = st.text_input("Search courts", placeholder="Type any state, district, complex or court name")
+    if query:
+        matches = court_index.search(query)
+        if matches:
+            picked = st.selectbox(
+                "Matching courts",
+                options=[()] + matches,
+                format_func=lambda path: format_path(path) if path else "",
+            )
+        else:
+            st.caption("No matching courts found.")
+
+    state = st.selectbox("State", options=[""] + states, index=_preselect(states, picked, 0))
 
     districts: List[str] = []
     if state:
-        districts = simple_scraper.get_districts(state)
+        districts = court_index.children(state)
 
-    district = st.selectbox("District", options=[""] + districts, index=0, disabled=not bool(state))
+    district = st.selectbox(
+        "District",
+        options=[""] + districts,
+        index=_preselect(districts, picked, 1),
+        disabled=not bool(state),
+    )
 
     complexes: List[str] = []
     if state and district:
-        complexes = simple_scraper.get_court_complexes(state, district)
+        complexes = court_index.children(state, district)
 
     court_complex = st.selectbox(
         "Court Complex",
         options=[""] + complexes,
-        index=0,
+        index=_preselect(complexes, picked, 2),
         disabled=not bool(state and district),
     )
 
     courts: List[str] = []
     if court_complex:
-        courts = simple_scraper.get_courts(state, district, court_complex)
+        courts = court_index.children(state, district, court_complex)
 
     court_name = st.selectbox(
         "Court Name",
         options=[""] + courts,
-        index=0,
+        index=_preselect(courts, picked, 3),
         disabled=not bool(court_complex),
     )
 
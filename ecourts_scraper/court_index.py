@@ -0,0 +1,147 @@
+"""In-memory search index over the State → District → Complex → Court hierarchy."""
+
+from __future__ import annotations
+
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+PATH_SEPARATOR = " → "
+
+CourtPath = Tuple[str, ...]
+
+
+class CourtIndex:
+    """Prefix and substring index over every state, district, complex and court.
+
+    Every node is kept as its full path, e.g. ``("Maharashtra", "Mumbai")``,
+    ordered shallowest first. Two structures answer a query:
+
+    * a sorted list of lowercased node names, bisected for names that start
+      with the query;
+    * an inverted index from each distinct word to the paths that contain
+      it. A query word is looked up in the (small) vocabulary, and only the
+      paths of its rarest word are checked against the other words.
+
+    Both stop as soon as ``limit`` results are found. A keystroke takes a few
+    milliseconds even with tens of thousands of courts.
+    """
+
+    def __init__(self, paths: Iterable[CourtPath]) -> None:
+        seen: Set[CourtPath] = set()
+        unique: List[CourtPath] = []
+        for path in paths:
+            if path and path not in seen:
+                seen.add(path)
+                unique.append(path)
+        unique.sort(key=len)
+
+        self.paths: List[CourtPath] = unique
+        self._children: Dict[CourtPath, List[str]] = {}
+        self._labels: List[str] = []
+        postings: Dict[str, array] = {}
+        for record, path in enumerate(unique):
+            self._children.setdefault(path[:-1], []).append(path[-1])
+            label = "\t".join(path).lower()
+            self._labels.append(label)
+            for token in set(label.split()):
+                postings.setdefault(token, array("I")).append(record)
+
+        self._names = sorted((path[-1].lower(), record) for record, path in enumerate(unique))
+        self._vocabulary = sorted(postings)
+        self._postings = [postings[token] for token in self._vocabulary]
+        self._vocabulary_blob = "\n".join(self._vocabulary)
+        self._vocabulary_offsets: List[int] = []
+        position = 0
+        for token in self._vocabulary:
+            self._vocabulary_offsets.append(position)
+            position += len(token) + 1
+
+    @classmethod
+    def build(cls, states: List[str], source) -> "CourtIndex":
+        """Walk ``source`` (a scraper exposing ``get_districts`` and friends) once."""
+        paths: List[CourtPath] = []
+        for state in states:
+            paths.append((state,))
+            for district in source.get_districts(state):
+                paths.append((state, district))
+                for complex_ in source.get_court_complexes(state, district):
+                    paths.append((state, district, complex_))
+                    for court in source.get_courts(state, district, complex_):
+                        paths.append((state, district, complex_, court))
+        return cls(paths)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def children(self, *path: str) -> List[str]:
+        """Names one level below ``path``; with no arguments, the states."""
+        return list(self._children.get(tuple(path), []))
+
+    def search(self, query: str, limit: int = 20) -> List[CourtPath]:
+        """Paths matching ``query``, best matches first.
+
+        Nodes whose own name starts with the query come first. After them
+        come paths that contain every word of the query in any order,
+        shallowest first.
+        """
+        words = query.lower().split()
+        if not words or limit <= 0:
+            return []
+        phrase = " ".join(words)
+
+        results: List[int] = []
+        taken: Set[int] = set()
+        start = bisect_left(self._names, (phrase,))
+        end = bisect_right(self._names, (phrase + "\uffff",))
+        for _, record in self._names[start:min(end, start + limit)]:
+            results.append(record)
+            taken.add(record)
+
+        if len(results) < limit:
+            for record in self._scan(words):
+                if record in taken:
+                    continue
+                results.append(record)
+                if len(results) >= limit:
+                    break
+
+        return [self.paths[record] for record in results]
+
+    def _matching_tokens(self, word: str) -> List[int]:
+        tokens: List[int] = []
+        blob = self._vocabulary_blob
+        pos = blob.find(word)
+        while pos != -1:
+            token = bisect_right(self._vocabulary_offsets, pos) - 1
+            tokens.append(token)
+            if token + 1 >= len(self._vocabulary_offsets):
+                break
+            pos = blob.find(word, self._vocabulary_offsets[token + 1])
+        return tokens
+
+    def _scan(self, words: List[str]) -> Iterator[int]:
+        """Yield paths containing every word, in index order."""
+        rarest: List[array] = []
+        rarest_size = -1
+        for word in set(words):
+            postings = [self._postings[t] for t in self._matching_tokens(word)]
+            if not postings:
+                return
+            size = sum(len(p) for p in postings)
+            if rarest_size < 0 or size < rarest_size:
+                rarest, rarest_size = postings, size
+
+        previous = -1
+        for record in heapq.merge(*rarest):
+            if record == previous:
+                continue
+            previous = record
+            label = self._labels[record]
+            if all(w in label for w in words):
+                yield record
+
+
+def format_path(path: CourtPath) -> str:
+    return PATH_SEPARATOR.join(path)
@@ -0,0 +1,333 @@
+"""Streaming export of collected cause-list data.
+
+Download records come from the ``history.json`` written by
+``append_history`` and from the results table of a ``SqliteJobQueue``. They
+can be followed by the rows of each downloaded HTML cause list. Everything is
+read and written one record at a time, so memory use does not grow with the
+size of the export.
+"""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import itertools
+import json
+import os
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from bs4 import BeautifulSoup
+
+
+DOWNLOAD = "download"
+CAUSE_LIST_ENTRY = "cause_list_entry"
+# Table columns of a cause list entry are prefixed so they never clash with download metadata.
+ENTRY_PREFIX = "entry_"
+
+CSV_FIELDS = [
+    "record_type",
+    "state",
+    "district",
+    "court_complex",
+    "court_name",
+    "date",
+    "case_type",
+    "download_path",
+    "timestamp",
+    "source",
+    "entry_sr_no",
+    "entry_case_no",
+    "entry_case_title",
+    "entry_petitioner",
+    "entry_respondent",
+    "entry_stage",
+]
+
+_COURT_PATH_FIELDS = ("state", "district", "court_complex", "court_name")
+_CHUNK_SIZE = 64 * 1024
+_WHITESPACE = re.compile(r"\s*")
+
+
+@dataclass
+class ExportFilter:
+    """Which records to export.
+
+    ``court_path`` is a prefix of (state, district, court complex, court),
+    e.g. ``("Maharashtra", "Mumbai")``. Dates are inclusive.
+
+    Bulk "Download All Courts" runs are logged with court name ``"*"``, so
+    those records match court paths down to the complex but never a filter
+    that names a court.
+    """
+
+    court_path: Tuple[str, ...] = ()
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    case_type: Optional[str] = None
+
+    def matches(self, record: Dict[str, Any]) -> bool:
+        for field, wanted in zip(_COURT_PATH_FIELDS, self.court_path):
+            if record.get(field) != wanted:
+                return False
+        if self.case_type and (record.get("case_type") or "").lower() != self.case_type.lower():
+            return False
+        if self.date_from or self.date_to:
+            try:
+                on_date = date.fromisoformat(record.get("date") or "")
+            except ValueError:
+                return False
+            if self.date_from and on_date < self.date_from:
+                return False
+            if self.date_to and on_date > self.date_to:
+                return False
+        return True
+
+
+def iter_json_array(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the items of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = f.read(_CHUNK_SIZE)
+        eof = not buffer
+        pos = _WHITESPACE.match(buffer).end()
+        while pos == len(buffer) and not eof:
+            buffer = f.read(_CHUNK_SIZE)
+            eof = not buffer
+            pos = _WHITESPACE.match(buffer).end()
+        if not buffer.startswith("[", pos):
+            raise ValueError(f"{path} does not contain a JSON array")
+        pos += 1
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if buffer.startswith("]", pos):
+                return
+            if buffer.startswith(",", pos):
+                pos += 1
+                continue
+            try:
+                if pos == len(buffer):
+                    raise ValueError(f"{path}: unexpected end of JSON array")
+                item, end = decoder.raw_decode(buffer, pos)
+                # A number cut at the chunk boundary ("12" of "12345", "3." of "3.5") still
+                # decodes, so only accept a value once the "," or "]" after it is in the buffer.
+                after = _WHITESPACE.match(buffer, end).end()
+                if after == len(buffer) or buffer[after] not in ",]":
+                    raise ValueError(f"{path}: expected ',' or ']' at offset {after}")
+            except ValueError:
+                if eof:
+                    raise
+                chunk = f.read(_CHUNK_SIZE)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            pos = end
+            yield item
+
+
+def iter_history_records(history_path: str) -> Iterator[Dict[str, Any]]:
+    """Download records from a history file written by ``append_history``.
+
+    Like ``append_history``, a missing, empty or non-array file counts as no history.
+    """
+    if not os.path.exists(history_path):
+        return
+    items = iter_json_array(history_path)
+    try:
+        first = next(items, None)
+    except ValueError:
+        return
+    if first is None:
+        return
+    for item in itertools.chain([first], items):
+        yield {
+            "record_type": DOWNLOAD,
+            "state": item.get("state"),
+            "district": item.get("district"),
+            "court_complex": item.get("court_complex"),
+            "court_name": item.get("court_name"),
+            "date": item.get("date"),
+            "case_type": item.get("case_type"),
+            "download_path": item.get("download_path"),
+            "timestamp": item.get("timestamp"),
+            "source": "history",
+        }
+
+
+def _isoformat_utc(epoch: float) -> str:
+    # Same shape as the timestamps append_history writes.
+    return datetime.fromtimestamp(epoch, timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+
+
+def iter_queue_records(queue) -> Iterator[Dict[str, Any]]:
+    """Successful download records from a ``SqliteJobQueue``'s results table."""
+    for item in queue.iter_results():
+        if not item["ok"] or not item["file_path"]:
+            continue
+        yield {
+            "record_type": DOWNLOAD,
+            "state": item.get("state"),
+            "district": item.get("district"),
+            "court_complex": item.get("court_complex"),
+            "court_name": item.get("court_name"),
+            "date": item.get("on_date"),
+            "case_type": item.get("case_type"),
+            "download_path": item["file_path"],
+            "timestamp": _isoformat_utc(item["finished_at"]),
+            "source": "queue",
+        }
+
+
+def _column_name(header: str) -> str:
+    name = re.sub(r"[^a-z0-9]+", "_", header.lower()).strip("_")
+    return name or "column"
+
+
+def iter_cause_list_entries(download: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Rows of the cause list table in a downloaded HTML file.
+
+    Each row carries the download's fields plus its table cells as
+    ``entry_<column>``, e.g. ``entry_case_no``.
+
+    PDF downloads are skipped; their contents are not parsed.
+    """
+    path = download.get("download_path") or ""
+    if not path.lower().endswith((".html", ".htm")) or not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        soup = BeautifulSoup(f, "html.parser")
+    for table in soup.find_all("table"):
+        headers: List[str] = []
+        for row in table.find_all("tr"):
+            header_cells = row.find_all("th")
+            if header_cells:
+                headers = [_column_name(c.get_text(strip=True)) for c in header_cells]
+                continue
+            cells = [c.get_text(strip=True) for c in row.find_all("td")]
+            if not cells:
+                continue
+            entry = {**download, "record_type": CAUSE_LIST_ENTRY}
+            for i, value in enumerate(cells):
+                column = headers[i] if i < len(headers) else f"column_{i + 1}"
+                entry[f"{ENTRY_PREFIX}{column}"] = value
+            yield entry
+
+
+def iter_export_records(
+    history_path: Optional[str] = None,
+    queue=None,
+    export_filter: Optional[ExportFilter] = None,
+    include_entries: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """Stream download records (and optionally their cause list rows) that pass the filter."""
+    export_filter = export_filter or ExportFilter()
+    sources: List[Iterable[Dict[str, Any]]] = []
+    if history_path:
+        sources.append(iter_history_records(history_path))
+    if queue is not None:
+        sources.append(iter_queue_records(queue))
+    for source in sources:
+        for record in source:
+            if not export_filter.matches(record):
+                continue
+            yield record
+            if include_entries:
+                yield from iter_cause_list_entries(record)
+
+
+def _open_output(out_path: str, compress: Optional[bool]) -> TextIO:
+    if compress is None:
+        compress = out_path.endswith(".gz")
+    if compress:
+        return io.TextIOWrapper(gzip.open(out_path, "wb"), encoding="utf-8", newline="")
+    return open(out_path, "w", encoding="utf-8", newline="")
+
+
+def write_ndjson(records: Iterable[Dict[str, Any]], out_path: str, compress: Optional[bool] = None) -> int:
+    """Write one JSON object per line. Gzip when ``compress`` is set or the path ends in ``.gz``."""
+    count = 0
+    with _open_output(out_path, compress) as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False, default=str))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def write_csv(
+    records: Iterable[Dict[str, Any]],
+    out_path: str,
+    compress: Optional[bool] = None,
+    fields: Optional[List[str]] = None,
+) -> int:
+    """Write records as CSV with ``fields`` as columns; other keys are dropped."""
+    count = 0
+    with _open_output(out_path, compress) as f:
+        writer = csv.DictWriter(f, fieldnames=fields or CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            count += 1
+    return count
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export collected cause list data as NDJSON or CSV.")
+    parser.add_argument("output", help="Output file; a .gz suffix enables gzip")
+    parser.add_argument("--history", default="history.json", help="History file written by the web app")
+    parser.add_argument("--queue", default=None, help="SQLite job queue file to include results from")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--state")
+    parser.add_argument("--district")
+    parser.add_argument("--court-complex")
+    parser.add_argument("--court-name", help="Excludes bulk downloads, which are logged without a court name")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="YYYY-MM-DD")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="YYYY-MM-DD")
+    parser.add_argument("--case-type", choices=["Civil", "Criminal"])
+    parser.add_argument("--entries", action="store_true", help="Also export rows of downloaded HTML cause lists")
+    args = parser.parse_args(argv)
+
+    levels = [
+        ("--state", args.state),
+        ("--district", args.district),
+        ("--court-complex", args.court_complex),
+        ("--court-name", args.court_name),
+    ]
+    court_path: List[str] = []
+    for i, (flag, part) in enumerate(levels):
+        if not part:
+            given = [f for f, value in levels[i + 1:] if value]
+            if given:
+                parser.error(f"{given[0]} requires {flag}")
+            break
+        court_path.append(part)
+    export_filter = ExportFilter(
+        court_path=tuple(court_path),
+        date_from=args.date_from,
+        date_to=args.date_to,
+        case_type=args.case_type,
+    )
+
+    queue = None
+    if args.queue:
+        from .job_queue import SqliteJobQueue
+
+        queue = SqliteJobQueue(args.queue)
+    try:
+        records = iter_export_records(args.history, queue, export_filter, include_entries=args.entries)
+        writer = write_csv if args.format == "csv" else write_ndjson
+        count = writer(records, args.output)
+        print(f"Exported {count} records to {args.output}")
+    finally:
+        if queue is not None:
+            queue.close()
+
+
+if __name__ == "__main__":
+    main()
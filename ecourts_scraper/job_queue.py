@@ -0,0 +1,386 @@
+"""Shared job queue for running the scraper across several workers.
+
+Jobs are ``CourtSelection`` objects stored in a SQLite file. Put the file on
+shared storage to spread a crawl over several hosts, or use ``":memory:"``
+for a single-process stand-in. Workers lease jobs for a fixed time and renew
+the lease with heartbeats. A job whose lease runs out (crashed worker) is
+handed to the next worker that asks.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .scraper import CourtSelection, DownloadResult, EcourtsScraper
+
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload TEXT NOT NULL UNIQUE,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker_id TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_lease ON jobs (status, lease_expires);
+CREATE TABLE IF NOT EXISTS results (
+    job_id INTEGER PRIMARY KEY REFERENCES jobs (id),
+    worker_id TEXT NOT NULL,
+    ok INTEGER NOT NULL,
+    message TEXT,
+    file_path TEXT,
+    finished_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rate_limit (
+    host TEXT PRIMARY KEY,
+    next_at REAL NOT NULL
+);
+"""
+
+
+@dataclass
+class LeasedJob:
+    job_id: int
+    selection: CourtSelection
+    attempts: int
+
+
+def _selection_to_payload(selection: CourtSelection) -> str:
+    data = asdict(selection)
+    data["on_date"] = selection.on_date.isoformat()
+    return json.dumps(data, sort_keys=True, ensure_ascii=False)
+
+
+def _selection_from_payload(payload: str) -> CourtSelection:
+    data = json.loads(payload)
+    data["on_date"] = date.fromisoformat(data["on_date"])
+    return CourtSelection(**data)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class SqliteJobQueue:
+    """Lease-based job queue backed by a SQLite database file."""
+
+    def __init__(self, db_path: str, lease_seconds: float = 300.0, max_attempts: int = 3) -> None:
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA busy_timeout = 30000")
+        self._conn.executescript(_SCHEMA)
+
+    def enqueue(self, selections: Iterable[CourtSelection]) -> int:
+        """Add jobs, skipping any already queued. Returns the number added."""
+        now = time.time()
+        rows = [(_selection_to_payload(s), now) for s in selections]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO jobs (payload, updated_at) VALUES (?, ?)", rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return self._conn.total_changes - before
+
+    def lease(self, worker_id: str) -> Optional[LeasedJob]:
+        """Claim the next pending job, or one whose lease has expired."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, payload, attempts FROM jobs "
+                    "WHERE (status = ? OR (status = ? AND lease_expires < ?)) AND attempts < ? "
+                    "ORDER BY id LIMIT 1",
+                    (PENDING, LEASED, now, self.max_attempts),
+                ).fetchone()
+                if row is None:
+                    self._fail_exhausted(now)
+                    self._conn.execute("COMMIT")
+                    return None
+                job_id, payload, attempts = row
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, worker_id = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (LEASED, worker_id, now + self.lease_seconds, now, job_id),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return LeasedJob(job_id=job_id, selection=_selection_from_payload(payload), attempts=attempts + 1)
+
+    def _fail_exhausted(self, now: float) -> None:
+        # Expired leases that used up their attempts would otherwise stay "leased" forever.
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, updated_at = ? "
+            "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+            (FAILED, now, LEASED, now, self.max_attempts),
+        )
+
+    def next_lease_check(self) -> Optional[float]:
+        """Epoch time at which unfinished work may become leasable, or None if nothing is left.
+
+        Returns the current time if a job is pending right now, otherwise the
+        earliest expiry among jobs still leased (possibly by a dead worker).
+        """
+        now = time.time()
+        with self._lock:
+            pending, earliest = self._conn.execute(
+                "SELECT SUM(status = ? AND attempts < ?), MIN(CASE WHEN status = ? THEN lease_expires END) "
+                "FROM jobs",
+                (PENDING, self.max_attempts, LEASED),
+            ).fetchone()
+        if pending:
+            return now
+        return earliest
+
+    def reserve_request_slot(self, host: str, min_interval: float) -> float:
+        """Book the next request slot for ``host``; returns seconds to wait before using it.
+
+        Slots are kept in the database, so every worker on ``host`` shares
+        one ``min_interval`` gap, whatever the number of processes.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT next_at FROM rate_limit WHERE host = ?", (host,)).fetchone()
+                slot = max(now, row[0]) if row else now
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_limit (host, next_at) VALUES (?, ?)",
+                    (host, slot + min_interval),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return slot - now
+
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """Extend the lease. Returns False if the job now belongs to someone else."""
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = ?",
+                (now + self.lease_seconds, now, job_id, worker_id, LEASED),
+            )
+            return cur.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str, result: DownloadResult) -> bool:
+        """Store the result and mark the job done.
+
+        A failed job goes back to pending while it has attempts left and is
+        marked failed once they are used up.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT attempts FROM jobs WHERE id = ? AND worker_id = ? AND status = ?",
+                    (job_id, worker_id, LEASED),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("ROLLBACK")
+                    return False
+                if result.ok:
+                    status = DONE
+                elif row[0] < self.max_attempts:
+                    status = PENDING
+                else:
+                    status = FAILED
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, worker_id = CASE WHEN ? = ? THEN NULL ELSE worker_id END, "
+                    "lease_expires = NULL, updated_at = ? WHERE id = ?",
+                    (status, status, PENDING, now, job_id),
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (job_id, worker_id, ok, message, file_path, finished_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (job_id, worker_id, int(result.ok), result.message, result.file_path, now),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return True
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: n for status, n in rows}
+
+    def results(self) -> List[Dict[str, Any]]:
+        return list(self.iter_results())
+
+    def iter_results(self, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Yield stored results in job order, fetching ``batch_size`` rows at a time."""
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT r.job_id, j.payload, r.worker_id, r.ok, r.message, r.file_path, r.finished_at "
+                    "FROM results r JOIN jobs j ON j.id = r.job_id WHERE r.job_id > ? "
+                    "ORDER BY r.job_id LIMIT ?",
+                    (last_id, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for job_id, payload, worker_id, ok, message, file_path, finished_at in rows:
+                yield {
+                    **json.loads(payload),
+                    "worker_id": worker_id,
+                    "ok": bool(ok),
+                    "message": message,
+                    "file_path": file_path,
+                    "finished_at": finished_at,
+                }
+            last_id = rows[-1][0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class _Heartbeat(threading.Thread):
+    def __init__(self, queue: SqliteJobQueue, job_id: int, worker_id: str, interval: float) -> None:
+        super().__init__(daemon=True)
+        self.queue = queue
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            if not self.queue.heartbeat(self.job_id, self.worker_id):
+                break
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+def run_worker(
+    queue: SqliteJobQueue,
+    scraper: Optional[EcourtsScraper] = None,
+    worker_id: Optional[str] = None,
+    min_interval: float = 2.0,
+    idle_exit: bool = True,
+    poll_seconds: float = 5.0,
+    host: Optional[str] = None,
+) -> int:
+    """Pull jobs from ``queue`` until none are pending or leased and download each one.
+
+    ``min_interval`` is the smallest gap in seconds between two requests
+    from ``host`` (this machine by default), shared by all workers on it
+    through the queue database. With
+    ``idle_exit=False`` the worker keeps polling for new jobs. Returns the
+    number of jobs this worker finished.
+    """
+    worker_id = worker_id or default_worker_id()
+    own_scraper = scraper is None
+    scraper = scraper or EcourtsScraper()
+    heartbeat_interval = max(queue.lease_seconds / 3, 1.0)
+    host = host or socket.gethostname()
+    finished = 0
+    try:
+        while True:
+            job = queue.lease(worker_id)
+            if job is None:
+                check_at = queue.next_lease_check()
+                if check_at is None and idle_exit:
+                    break
+                # Leases held by crashed workers are picked up once they expire.
+                delay = poll_seconds if check_at is None else check_at - time.time()
+                time.sleep(min(max(delay, 0.1), poll_seconds))
+                continue
+
+            # The heartbeat covers the wait for a request slot too; with many workers
+            # on a host that wait can be longer than the lease.
+            beat = _Heartbeat(queue, job.job_id, worker_id, heartbeat_interval)
+            beat.start()
+            try:
+                wait = queue.reserve_request_slot(host, min_interval) if min_interval > 0 else 0.0
+                if wait > 0:
+                    time.sleep(wait)
+                try:
+                    result = scraper.download_cause_list_pdf(job.selection)
+                except Exception as e:
+                    result = DownloadResult(False, f"Worker error: {e}", None)
+                completed = queue.complete(job.job_id, worker_id, result)
+            finally:
+                beat.stop()
+
+            if completed:
+                if result.ok or job.attempts >= queue.max_attempts:
+                    finished += 1
+            else:
+                print(f"Lease lost for job {job.job_id}, result discarded")
+    finally:
+        if own_scraper:
+            scraper.close()
+    return finished
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run an eCourts crawl worker against a shared SQLite job queue.")
+    parser.add_argument("db_path", help="SQLite queue file (on shared storage for multi-host crawls)")
+    parser.add_argument("--downloads-dir", default="downloads")
+    parser.add_argument("--lease-seconds", type=float, default=300.0)
+    parser.add_argument(
+        "--min-interval",
+        type=float,
+        default=2.0,
+        help="Seconds between requests from this host, shared by all its workers",
+    )
+    parser.add_argument("--worker-id", default=None)
+    parser.add_argument("--follow", action="store_true", help="Keep polling for new jobs instead of exiting when idle")
+    args = parser.parse_args(argv)
+
+    queue = SqliteJobQueue(args.db_path, lease_seconds=args.lease_seconds)
+    scraper = EcourtsScraper(downloads_dir=args.downloads_dir)
+    try:
+        count = run_worker(
+            queue,
+            scraper=scraper,
+            worker_id=args.worker_id,
+            min_interval=args.min_interval,
+            idle_exit=not args.follow,
+        )
+        print(f"Worker finished {count} jobs: {queue.counts()}")
+    finally:
+        scraper.close()
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()